@@ -1,11 +1,109 @@
 """Sentiment analysis using LLM integration."""
 
-import json
-from typing import Dict, Optional, Any
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Any, Set, Tuple
 from advisor.core.database import Database
 from advisor.core.config import get_config
 
 
+_LEXICON_DIR = Path(__file__).parent / "lexicon"
+
+
+def _load_words(name: str) -> FrozenSet[str]:
+    """Load a one-word-per-line lexicon file."""
+    return frozenset((_LEXICON_DIR / f"{name}.txt").read_text().split())
+
+
+_POSITIVE_WORDS = _load_words("positive")
+_NEGATIVE_WORDS = _load_words("negative")
+
+# Direction words ("rise", "fall") carry no fixed polarity in finance text:
+# "costs rose" is bad news while "profit rose" is good news (Malo et al.)
+_DIRECTION_UP = 2
+_DIRECTION_DOWN = -2
+
+# +1/-1 for sentiment words, +/-2 for direction words; others map to None
+_WORD_POLARITY = {
+    **{word: 1 for word in _POSITIVE_WORDS},
+    **{word: -1 for word in _NEGATIVE_WORDS},
+    **{word: _DIRECTION_UP for word in _load_words("direction_up")},
+    **{word: _DIRECTION_DOWN for word in _load_words("direction_down")}
+}
+
+# Entities whose movement decides the polarity of a nearby direction word
+_ENTITY_POLARITY = {
+    **{word: 1 for word in _load_words("entity_positive")},
+    **{word: -1 for word in _load_words("entity_negative")}
+}
+
+_DIRECTION_WINDOW = 3
+
+# Words are matched as whole tokens so 'buy' does not fire inside 'buyer'.
+# A single character class never backtracks in the stdlib engine, which
+# outruns re2 and the third-party regex module on this pattern.
+_TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+
+def _find_entity(tokens: List[str], index: int, consumed: Set[int]) -> Optional[int]:
+    """Find the nearest unconsumed entity word around a direction word."""
+    for offset in range(1, _DIRECTION_WINDOW + 1):
+        for candidate in (index - offset, index + offset):
+            if (0 <= candidate < len(tokens) and candidate not in consumed
+                    and tokens[candidate] in _ENTITY_POLARITY):
+                return candidate
+    return None
+
+
+def _count_polarity(tokens: List[str]) -> Tuple[int, int]:
+    """Count positive and negative signals in a token stream.
+    
+    A direction word next to an entity forms one phrase whose polarity is
+    direction times entity polarity ("losses fell" is positive); the entity
+    then no longer counts on its own. Direction words without an entity
+    nearby keep their plain meaning (up is positive, down is negative).
+    """
+    # map + Counter keep the per-token loop in C
+    polarities = list(map(_WORD_POLARITY.get, tokens))
+    counts = Counter(polarities)
+    positive = counts[1]
+    negative = counts[-1]
+    
+    if not counts[_DIRECTION_UP] and not counts[_DIRECTION_DOWN]:
+        return positive, negative
+    
+    consumed: Set[int] = set()
+    for index, polarity in enumerate(polarities):
+        if polarity != _DIRECTION_UP and polarity != _DIRECTION_DOWN:
+            continue
+        
+        sign = 1 if polarity == _DIRECTION_UP else -1
+        entity_index = _find_entity(tokens, index, consumed)
+        if entity_index is not None:
+            consumed.add(entity_index)
+            sign *= _ENTITY_POLARITY[tokens[entity_index]]
+            # The entity is part of this phrase now, not a separate signal
+            if polarities[entity_index] == 1:
+                positive -= 1
+            elif polarities[entity_index] == -1:
+                negative -= 1
+        
+        if sign > 0:
+            positive += 1
+        else:
+            negative += 1
+    
+    return positive, negative
+
+
+@lru_cache(maxsize=1024)
+def _ticker_pattern(ticker: str) -> re.Pattern[str]:
+    """Compile a case-insensitive presence check for a ticker once."""
+    return re.compile(re.escape(ticker), re.IGNORECASE)
+
+
 class SentimentAnalyzer:
     """LLM-based sentiment analyzer for stock mentions."""
     
@@ -13,7 +111,14 @@ class SentimentAnalyzer:
         """Initialize sentiment analyzer."""
         self.api_url = api_url or "https://api.openai.com/v1/chat/completions"
         self.api_key = api_key
-        self.db = Database(get_config().get_database_path())
+        config = get_config()
+        self.db = Database.get_shared(config.get_database_path())
+        
+        # Thresholds are fixed once config is initialized
+        self.buy_threshold = config.get("analysis.sentiment_threshold_buy", 0.7)
+        self.sell_threshold = config.get("analysis.sentiment_threshold_sell", 0.3)
+        self.min_mentions = 5  # Minimum mentions needed for confident recommendation
+        self.max_mentions = config.get("analysis.max_mentions_per_stock", 10000)
     
     def analyze_text(self, content: str, ticker: str) -> float:
         """Analyze sentiment of text content for a specific ticker.
@@ -27,27 +132,12 @@ class SentimentAnalyzer:
     
     def _simple_sentiment_analysis(self, content: str, ticker: str) -> float:
         """Simple keyword-based sentiment analysis as fallback."""
-        content_lower = content.lower()
-        ticker_lower = ticker.lower()
-        
-        # Only analyze if ticker is mentioned
-        if ticker_lower not in content_lower:
+        # Only analyze if ticker is mentioned; matching case-insensitively
+        # avoids lowercasing content that doesn't mention it
+        if not _ticker_pattern(ticker).search(content):
             return 0.0
         
-        positive_words = [
-            'buy', 'bullish', 'moon', 'rocket', 'gains', 'up', 'rise', 'good', 
-            'great', 'excellent', 'strong', 'beat', 'winning', 'profit', 'growth',
-            'increase', 'bull', 'positive', 'optimistic', 'upgrade'
-        ]
-        
-        negative_words = [
-            'sell', 'bearish', 'crash', 'dump', 'loss', 'down', 'fall', 'bad',
-            'terrible', 'weak', 'miss', 'losing', 'decline', 'decrease', 'bear',
-            'negative', 'pessimistic', 'downgrade', 'short'
-        ]
-        
-        positive_score = sum(1 for word in positive_words if word in content_lower)
-        negative_score = sum(1 for word in negative_words if word in content_lower)
+        positive_score, negative_score = _count_polarity(_TOKEN_PATTERN.findall(content.lower()))
         
         total_sentiment_words = positive_score + negative_score
         
@@ -59,65 +149,66 @@ class SentimentAnalyzer:
         return max(-1.0, min(1.0, sentiment))
     
     def analyze_mentions_for_stock(self, symbol: str, limit: Optional[int] = None) -> Dict[str, float]:
-        """Analyze sentiment for all mentions of a stock."""
-        mentions = self.db.get_mentions_for_stock(symbol, limit)
+        """Analyze sentiment for all mentions of a stock.
+        
+        Already scored mentions are aggregated inside SQLite; only mentions
+        without a score are fetched and analyzed, at most ``limit`` of them
+        per call (default ``analysis.max_mentions_per_stock``).
+        """
+        if limit is None:
+            limit = self.max_mentions
         
-        if not mentions:
-            return {"average_sentiment": 0.0, "total_mentions": 0, "analyzed": 0}
+        total_sentiment, analyzed_count, total_count = self.db.get_sentiment_stats(symbol)
         
-        total_sentiment = 0.0
-        analyzed_count = 0
+        updates = [
+            (self.analyze_text(mention['content'], symbol), mention['id'])
+            for mention in self.db.iter_unscored_mentions_for_stock(symbol, limit)
+        ]
         
-        for mention in mentions:
-            # Skip if already analyzed
-            if mention.get('sentiment_score') is not None:
-                total_sentiment += mention['sentiment_score']
-                analyzed_count += 1
-                continue
-            
-            # Analyze sentiment
-            sentiment = self.analyze_text(mention['content'], symbol)
-            
-            # Update database with sentiment score
-            metadata = json.loads(mention.get('metadata', '{}'))
-            external_id = f"reddit_{metadata.get('type', 'unknown')}_{mention.get('url', '').split('/')[-1]}"
-            
-            if self.db.update_sentiment_score(external_id, sentiment):
-                total_sentiment += sentiment
-                analyzed_count += 1
+        # Persist new scores in one transaction, then re-read the totals so
+        # the result counts exactly the scores that were stored
+        if updates:
+            self.db.update_sentiment_scores(updates)
+            total_sentiment, analyzed_count, total_count = self.db.get_sentiment_stats(symbol)
         
         average_sentiment = total_sentiment / analyzed_count if analyzed_count > 0 else 0.0
         
         return {
             "average_sentiment": average_sentiment,
-            "total_mentions": len(mentions),
+            "total_mentions": total_count,
             "analyzed": analyzed_count
         }
     
     def get_recommendation(self, sentiment_score: float, mention_count: float) -> str:
         """Get BUY/SELL/HOLD recommendation based on sentiment."""
-        config = get_config()
-        buy_threshold = config.get("analysis.sentiment_threshold_buy", 0.7)
-        sell_threshold = config.get("analysis.sentiment_threshold_sell", 0.3)
-        min_mentions = 5  # Minimum mentions needed for confident recommendation
-        
-        if mention_count < min_mentions:
+        if mention_count < self.min_mentions:
             return "HOLD"  # Not enough data
         
-        if sentiment_score >= buy_threshold:
+        if sentiment_score >= self.buy_threshold:
             return "BUY"
-        elif sentiment_score <= sell_threshold:
+        elif sentiment_score <= self.sell_threshold:
             return "SELL"
         else:
             return "HOLD"
     
     def analyze_all_stocks(self) -> Dict[str, Dict[str, Any]]:
-        """Analyze sentiment for all stocks in database."""
-        stocks = self.db.get_all_stocks()
+        """Analyze sentiment for all stocks in database.
+        
+        Stored scores for every stock come from a single aggregate query;
+        only stocks with unscored mentions go through per-stock analysis.
+        """
         results = {}
         
-        for stock in stocks:
-            analysis = self.analyze_mentions_for_stock(stock)
+        for stock, total_sentiment, analyzed_count, total_count in self.db.get_sentiment_summary():
+            if analyzed_count < total_count:
+                analysis = self.analyze_mentions_for_stock(stock)
+            else:
+                analysis = {
+                    "average_sentiment": total_sentiment / analyzed_count if analyzed_count > 0 else 0.0,
+                    "total_mentions": total_count,
+                    "analyzed": analyzed_count
+                }
+            
             recommendation = self.get_recommendation(
                 analysis["average_sentiment"], 
                 analysis["total_mentions"]
@@ -128,4 +219,4 @@ class SentimentAnalyzer:
                 "recommendation": recommendation
             }
         
-        return results
\ No newline at end of file
+        return results
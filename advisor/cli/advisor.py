@@ -65,8 +65,8 @@ def show_stock_details(symbol: str) -> None:
     print(f"🔍 Detailed Analysis for {symbol.upper()}")
     print("=" * 50)
     
-    # Get recent mentions
-    mentions = analyzer.db.get_mentions_for_stock(symbol.upper(), limit=10)
+    # Get recent mentions; rows are read by column name without copying to dicts
+    mentions = list(analyzer.db.iter_mentions_for_stock(symbol.upper(), limit=5))
     
     if not mentions:
         print(f"❌ No mentions found for {symbol.upper()}")
@@ -87,13 +87,13 @@ def show_stock_details(symbol: str) -> None:
     print("\n📝 Recent Mentions:")
     print("-" * 50)
     
-    for i, mention in enumerate(mentions[:5], 1):
+    for i, mention in enumerate(mentions, 1):
         content = mention['content'][:100] + "..." if len(mention['content']) > 100 else mention['content']
-        sentiment = mention.get('sentiment_score', 'Not analyzed')
+        sentiment = mention['sentiment_score']
         
         print(f"{i}. {content}")
-        print(f"   Sentiment: {sentiment}")
-        print(f"   URL: {mention.get('url', 'N/A')}")
+        print(f"   Sentiment: {'Not analyzed' if sentiment is None else sentiment}")
+        print(f"   URL: {mention['url'] or 'N/A'}")
         print()
 
 
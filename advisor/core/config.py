@@ -2,11 +2,66 @@
 
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from dotenv import load_dotenv
 
 
+# Built once at import; each Config starts from its own copy
+_DEFAULT_CONFIG: Dict[str, Any] = {
+    "database": {
+        "path": "advisor.db"
+    },
+    "reddit": {
+        "max_days": 3,
+        "min_days": 1,
+        "subreddits": ["WallStreetBets"],
+        "tickers": ["AAPL", "TSLA", "GOOG"]
+    },
+    "analysis": {
+        "sentiment_threshold_buy": 0.7,
+        "sentiment_threshold_sell": 0.3,
+        "max_mentions_per_stock": 10000
+    }
+}
+
+
+def _flatten(config: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """Yield (dotted key, value) for every node, sections included."""
+    for key, value in config.items():
+        dotted_key = f"{prefix}{key}"
+        yield dotted_key, value
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{dotted_key}.")
+
+
+def _copy_tree(value: Any) -> Any:
+    """Copy the dicts and lists of a JSON-like tree; leaves are immutable."""
+    if isinstance(value, dict):
+        return {key: _copy_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_tree(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=32)
+def _parse_config_file(config_path: Path, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a JSON config file; mtime and size key the cache so edits are seen."""
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
+def _load_config_file(config_path: Path) -> Optional[Dict[str, Any]]:
+    """Load a JSON config file, or None if it doesn't exist."""
+    try:
+        stat = config_path.stat()
+    except FileNotFoundError:
+        return None
+    # Callers merge into the result, so never hand out the cached dict itself
+    return _copy_tree(_parse_config_file(config_path, stat.st_mtime_ns, stat.st_size))
+
+
 class Config:
     """Global configuration manager."""
     
@@ -15,28 +70,29 @@ class Config:
         # Load environment variables
         load_dotenv()
         
-        # Default config
-        self._config = {
-            "database": {
-                "path": "advisor.db"
-            },
-            "reddit": {
-                "max_days": 3,
-                "min_days": 1,
-                "subreddits": ["WallStreetBets"],
-                "tickers": ["AAPL", "TSLA", "GOOG"]
-            },
-            "analysis": {
-                "sentiment_threshold_buy": 0.7,
-                "sentiment_threshold_sell": 0.3
-            }
-        }
+        # Default config; copied so merges never touch the shared defaults
+        self._config = _copy_tree(_DEFAULT_CONFIG)
         
         # Load additional config from file if provided
-        if config_path and Path(config_path).exists():
-            with open(config_path, 'r') as f:
-                file_config = json.load(f)
-                self._merge_config(file_config)
+        file_config = _load_config_file(Path(config_path)) if config_path else None
+        if file_config is not None:
+            self._merge_config(file_config)
+        
+        self._flat = dict(_flatten(self._config))
+    
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "Config":
+        """Copy the config tree directly instead of through generic deepcopy."""
+        config = self.__class__.__new__(self.__class__)
+        config._config = _copy_tree(self._config)
+        config._flat = dict(_flatten(config._config))
+        return config
+    
+    @classmethod
+    def from_json_str(cls, config_json: str) -> "Config":
+        """Create a configuration from a JSON string, merged over the defaults."""
+        config = cls()
+        config._merge_config(json.loads(config_json))
+        return config
     
     def _merge_config(self, new_config: Dict[str, Any]) -> None:
         """Merge new configuration with existing."""
@@ -45,19 +101,12 @@ class Config:
                 self._config[key].update(value)
             else:
                 self._config[key] = value
+        
+        self._flat = dict(_flatten(self._config))
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by dot notation key."""
-        keys = key.split('.')
-        value = self._config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        
-        return value
+        return self._flat.get(key, default)
     
     def get_reddit_config(self) -> Dict[str, Any]:
         """Get Reddit-specific configuration."""
@@ -1,7 +1,7 @@
 """Base data source class for all scrapers."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from .database import Database
 from .config import get_config
 
@@ -12,7 +12,7 @@ class DataSource(ABC):
     def __init__(self, config: Dict[str, Any]):
         """Initialize data source with configuration."""
         self.config = config
-        self.db = Database(get_config().get_database_path())
+        self.db = Database.get_shared(get_config().get_database_path())
         self._validate_config()
     
     @abstractmethod
@@ -36,8 +36,8 @@ class DataSource(ABC):
     
     def ensure_stocks_exist(self, tickers: List[str]) -> None:
         """Ensure all ticker symbols exist in the database."""
-        for ticker in tickers:
-            self.db.add_stock(ticker.upper())
+        if tickers:
+            self.db.add_stocks([ticker.upper() for ticker in tickers])
     
     def get_stock_id(self, symbol: str) -> Optional[int]:
         """Get stock ID for a symbol."""
@@ -48,6 +48,19 @@ class DataSource(ABC):
         """Store a mention in the database."""
         return self.db.add_mention(stock_id, content, url, external_id, metadata)
     
+    def store_mentions(self, mentions: List[Tuple[int, str, str, str, str]]) -> int:
+        """Store many mentions in one transaction.
+        
+        Args:
+            mentions: (stock_id, content, url, external_id, metadata) rows
+            
+        Returns:
+            int: Number of mentions stored
+        """
+        if not mentions:
+            return 0
+        return self.db.add_mentions(mentions)
+    
     def is_duplicate(self, external_id: str) -> bool:
         """Check if external_id already exists in database."""
         return self.db.is_duplicate(external_id)
\ No newline at end of file
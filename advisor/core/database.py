@@ -1,24 +1,90 @@
 """Database operations for the advisor system."""
 
 import sqlite3
+import threading
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator
+
+
+# Bump when the schema in _initialize_database changes
+_SCHEMA_VERSION = 1
+
+# Mentions inserted per multi-row INSERT; 64 rows x 5 columns stays well
+# under SQLite's bound-parameter limit
+_MENTION_INSERT_CHUNK = 64
+
+
+@lru_cache(maxsize=None)
+def _insert_mentions_sql(row_count: int) -> str:
+    """Build an INSERT with row_count VALUES tuples.
+    
+    OR IGNORE skips duplicate external_ids, but a foreign-key failure would
+    still abort the statement, so rows for unknown stocks are filtered out
+    and skipped the same way.
+    """
+    values = ", ".join(["(?, ?, ?, ?, ?)"] * row_count)
+    return (
+        "INSERT OR IGNORE INTO mentions (stock_id, content, url, external_id, metadata) "
+        f"SELECT * FROM (VALUES {values}) WHERE column1 IN (SELECT id FROM stocks)"
+    )
 
 
 class Database:
     """SQLite database manager for advisor system."""
     
+    # Process-wide instances handed out by get_shared(), keyed by resolved path
+    _shared_instances: Dict[Path, "Database"] = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(self, db_path: str = "advisor.db"):
         """Initialize database connection."""
         self.db_path = Path(db_path)
         self.connection: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
         self._initialize_database()
     
+    @classmethod
+    def get_shared(cls, db_path: str = "advisor.db") -> "Database":
+        """Get the process-wide Database for a path, opening it on first use.
+        
+        Reusing one instance skips reconnecting and re-running the schema
+        setup for every analyzer or data source. A shared instance that was
+        closed is replaced by a fresh one.
+        """
+        key = Path(db_path).resolve()
+        with cls._shared_lock:
+            db = cls._shared_instances.get(key)
+            if db is None or db.connection is None:
+                db = cls(db_path)
+                cls._shared_instances[key] = db
+            return db
+    
     def _initialize_database(self) -> None:
         """Create database and tables if they don't exist."""
-        self.connection = sqlite3.connect(self.db_path)
+        # Shared instances may be used from worker threads; writes are
+        # serialized through _write_lock
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
         self.connection.row_factory = sqlite3.Row
         
+        # WAL lets readers run alongside the scraper's writes, and NORMAL
+        # sync only fsyncs at checkpoints instead of on every commit
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA temp_store=MEMORY")
+        self.connection.execute("PRAGMA mmap_size=268435456")
+        self.connection.execute("PRAGMA cache_size=-65536")
+        # Wait for a concurrent writer instead of failing with "database is locked"
+        self.connection.execute("PRAGMA busy_timeout=10000")
+        # Reject mentions that point at a missing stock
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        
+        # The schema version is stored in the file, so a database that is
+        # already set up skips re-running the DDL below
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+        
         # Create stocks table
         self.connection.execute("""
             CREATE TABLE IF NOT EXISTS stocks (
@@ -43,6 +109,15 @@ class Database:
             )
         """)
         
+        # Serves per-stock lookups and their newest-first ordering; id breaks
+        # ties between mentions stored in the same second. external_id is
+        # already indexed by its UNIQUE constraint
+        self.connection.execute("""
+            CREATE INDEX IF NOT EXISTS ix_mentions_stock_recent
+            ON mentions (stock_id, created_at DESC, id DESC)
+        """)
+        
+        self.connection.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
         self.connection.commit()
     
     def add_stock(self, symbol: str) -> int:
@@ -50,22 +125,30 @@ class Database:
         if not self.connection:
             raise RuntimeError("Database connection not initialized")
             
-        self.connection.execute(
-            "INSERT OR IGNORE INTO stocks (symbol) VALUES (?)",
-            (symbol,)
-        )
-        self.connection.commit()
-        
-        # Get the stock ID
-        result = self.connection.execute(
-            "SELECT id FROM stocks WHERE symbol = ?",
-            (symbol,)
-        ).fetchone()
+        # The no-op update on conflict makes RETURNING yield the existing id
+        # too, so one statement covers both cases with no lookup race
+        with self._write_lock, self.connection:
+            result = self.connection.execute(
+                "INSERT INTO stocks (symbol) VALUES (?) "
+                "ON CONFLICT(symbol) DO UPDATE SET symbol = excluded.symbol RETURNING id",
+                (symbol,)
+            ).fetchone()
         
         if not result:
             raise ValueError(f"Failed to find stock with symbol: {symbol}")
         return int(result['id'])
     
+    def add_stocks(self, symbols: Iterable[str]) -> None:
+        """Add many stock symbols in a single transaction, skipping existing ones."""
+        if not self.connection:
+            raise RuntimeError("Database connection not initialized")
+        
+        with self._write_lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO stocks (symbol) VALUES (?)",
+                ((symbol,) for symbol in symbols)
+            )
+    
     def get_stock_id(self, symbol: str) -> Optional[int]:
         """Get stock ID by symbol."""
         if not self.connection:
@@ -80,19 +163,39 @@ class Database:
     
     def add_mention(self, stock_id: int, content: str, url: Optional[str] = None, 
                    external_id: Optional[str] = None, metadata: Optional[str] = None) -> bool:
-        """Add a mention to the database."""
+        """Add a mention to the database.
+        
+        Returns:
+            bool: False if a mention with the same external_id already exists
+                or stock_id has no stock
+        """
+        return self.add_mentions([(stock_id, content, url, external_id, metadata)]) == 1
+    
+    def add_mentions(self, mentions: Iterable[Tuple[int, str, Optional[str], Optional[str], Optional[str]]]) -> int:
+        """Add many mentions in a single transaction.
+        
+        Rows whose external_id already exists or whose stock_id has no
+        stock are skipped; the rest of the batch is still stored.
+        
+        Args:
+            mentions: (stock_id, content, url, external_id, metadata) rows
+            
+        Returns:
+            int: Number of mentions inserted
+        """
         if not self.connection:
             raise RuntimeError("Database connection not initialized")
-            
-        try:
-            self.connection.execute("""
-                INSERT INTO mentions (stock_id, content, url, external_id, metadata)
-                VALUES (?, ?, ?, ?, ?)
-            """, (stock_id, content, url, external_id, metadata))
-            self.connection.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+        
+        # One statement per chunk of rows instead of one per row
+        inserted = 0
+        rows = iter(mentions)
+        with self._write_lock, self.connection:
+            while chunk := list(islice(rows, _MENTION_INSERT_CHUNK)):
+                cursor = self.connection.execute(
+                    _insert_mentions_sql(len(chunk)), list(chain.from_iterable(chunk))
+                )
+                inserted += cursor.rowcount
+        return inserted
     
     def is_duplicate(self, external_id: str) -> bool:
         """Check if a mention with this external_id already exists."""
@@ -106,47 +209,164 @@ class Database:
         
         return result is not None
     
-    def get_mentions_for_stock(self, symbol: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get all mentions for a specific stock."""
+    def iter_mentions_for_stock(self, symbol: str, limit: Optional[int] = None) -> Iterator[sqlite3.Row]:
+        """Iterate over mentions for a specific stock, newest first.
+        
+        Rows are streamed from the cursor, so the full result set is never
+        held in memory at once.
+        """
         query = """
-            SELECT m.content, m.url, m.metadata, m.sentiment_score, m.created_at
+            SELECT m.content, m.url, m.external_id, m.metadata, m.sentiment_score, m.created_at
             FROM mentions m
             JOIN stocks s ON m.stock_id = s.id
             WHERE s.symbol = ?
-            ORDER BY m.created_at DESC
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT ?
+        """
+        
+        if not self.connection:
+            raise RuntimeError("Database connection not initialized")
+        
+        # A missing or zero limit means no limit, which is SQLite's LIMIT -1
+        return self.connection.execute(
+            query, (symbol, -1 if not limit else limit)
+        )
+    
+    def get_mentions_for_stock(self, symbol: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get all mentions for a specific stock as dicts.
+        
+        Callers that only read a few columns should use
+        iter_mentions_for_stock() and skip the per-row dict copy.
+        """
+        return [dict(row) for row in self.iter_mentions_for_stock(symbol, limit)]
+    
+    def get_sentiment_stats(self, symbol: str) -> Tuple[float, int, int]:
+        """Aggregate stored sentiment for a stock.
+        
+        Returns:
+            Tuple[float, int, int]: (sum of scores, scored mentions, total mentions)
         """
+        if not self.connection:
+            raise RuntimeError("Database connection not initialized")
         
-        if limit:
-            query += f" LIMIT {limit}"
+        result = self.connection.execute("""
+            SELECT TOTAL(m.sentiment_score), COUNT(m.sentiment_score), COUNT(*)
+            FROM mentions m
+            JOIN stocks s ON m.stock_id = s.id
+            WHERE s.symbol = ?
+        """, (symbol,)).fetchone()
+        
+        return float(result[0]), int(result[1]), int(result[2])
+    
+    def iter_unscored_mentions_for_stock(self, symbol: str, limit: Optional[int] = None) -> Iterator[sqlite3.Row]:
+        """Iterate over mentions without a sentiment score, newest first."""
+        query = """
+            SELECT m.id, m.content, m.external_id
+            FROM mentions m
+            JOIN stocks s ON m.stock_id = s.id
+            WHERE s.symbol = ? AND m.sentiment_score IS NULL
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT ?
+        """
         
         if not self.connection:
             raise RuntimeError("Database connection not initialized")
-            
-        results = self.connection.execute(query, (symbol,)).fetchall()
-        return [dict(row) for row in results]
+        
+        return self.connection.execute(
+            query, (symbol, -1 if not limit else limit)
+        )
     
     def update_sentiment_score(self, external_id: str, sentiment_score: float) -> bool:
         """Update sentiment score for a mention."""
         if not self.connection:
             raise RuntimeError("Database connection not initialized")
             
-        cursor = self.connection.execute(
-            "UPDATE mentions SET sentiment_score = ? WHERE external_id = ?",
-            (sentiment_score, external_id)
-        )
-        self.connection.commit()
+        with self._write_lock:
+            cursor = self.connection.execute(
+                "UPDATE mentions SET sentiment_score = ? WHERE external_id = ?",
+                (sentiment_score, external_id)
+            )
+            self.connection.commit()
         return cursor.rowcount > 0
     
+    def update_sentiment_scores(self, scores: List[Tuple[float, int]]) -> int:
+        """Update sentiment scores for many mentions in a single transaction.
+        
+        Mentions are keyed by row id, which every mention has; external_id
+        may be NULL and would never match.
+        
+        Args:
+            scores: (sentiment_score, mention id) pairs
+            
+        Returns:
+            int: Number of mentions updated
+        """
+        if not self.connection:
+            raise RuntimeError("Database connection not initialized")
+        
+        with self._write_lock, self.connection:
+            cursor = self.connection.executemany(
+                "UPDATE mentions SET sentiment_score = ? WHERE id = ?",
+                scores
+            )
+        return cursor.rowcount
+    
     def get_all_stocks(self) -> List[str]:
-        """Get all stock symbols in the database."""
+        """Get all stock symbols in the database, in alphabetical order."""
         if not self.connection:
             raise RuntimeError("Database connection not initialized")
             
-        results = self.connection.execute("SELECT symbol FROM stocks").fetchall()
-        return [row['symbol'] for row in results]
+        # A plain tuple cursor; one bare column doesn't need sqlite3.Row.
+        # The order comes free from walking the symbol unique index
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        return [symbol for (symbol,) in cursor.execute("SELECT symbol FROM stocks ORDER BY symbol")]
+    
+    def get_stock_ids(self) -> Dict[str, int]:
+        """Get a symbol -> id map for every stock in the database."""
+        if not self.connection:
+            raise RuntimeError("Database connection not initialized")
+            
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        return dict(cursor.execute("SELECT symbol, id FROM stocks"))
+    
+    def get_sentiment_summary(self) -> List[Tuple[str, float, int, int]]:
+        """Aggregate stored sentiment for every stock in one query.
+        
+        Returns:
+            List[Tuple[str, float, int, int]]: (symbol, sum of scores,
+            scored mentions, total mentions) per stock
+        """
+        if not self.connection:
+            raise RuntimeError("Database connection not initialized")
+        
+        results = self.connection.execute("""
+            SELECT s.symbol, TOTAL(m.sentiment_score), COUNT(m.sentiment_score), COUNT(m.id)
+            FROM stocks s
+            LEFT JOIN mentions m ON m.stock_id = s.id
+            GROUP BY s.id
+        """)
+        return [(row[0], float(row[1]), int(row[2]), int(row[3])) for row in results]
     
     def close(self) -> None:
         """Close database connection."""
         if self.connection:
-            self.connection.close()
-            self.connection = None
\ No newline at end of file
+            try:
+                # Refresh planner statistics for the next open; an in-memory
+                # database is gone once closed, so it has no next open
+                if str(self.db_path) != ":memory:":
+                    self.connection.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                # Statistics are only a planner hint; a locked database
+                # must not keep the connection open
+                pass
+            finally:
+                self.connection.close()
+                self.connection = None
+    
+    def __del__(self) -> None:
+        """Close the connection when the instance is garbage collected."""
+        # connection may be missing if __init__ failed before opening it
+        if getattr(self, "connection", None) is not None:
+            self.close()
\ No newline at end of file
@@ -4,9 +4,9 @@ import json
 import os
 import re
 import time
-from datetime import datetime, timezone
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
 
 import praw
 from dotenv import load_dotenv
@@ -14,6 +14,11 @@ from dotenv import load_dotenv
 # Import from advisor package
 from advisor.core.data_source import DataSource
 
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Pending mentions are written in one transaction once this many accumulate
+MENTION_BATCH_SIZE = 1000
+
 
 class RedditDataSource(DataSource):
     """Reddit data source for scraping stock-related content."""
@@ -26,19 +31,31 @@ class RedditDataSource(DataSource):
         
         super().__init__(config)
         
-        # Initialize Reddit API client
-        self.reddit = praw.Reddit(
-            client_id=os.getenv("CLIENT_ID"),
-            client_secret=os.getenv("CLIENT_SECRET"),
-            user_agent=os.getenv("USER_AGENT"),
-        )
-        
-        # Create ticker pattern for matching
+        # Plain word tickers are found by set lookup over the text's words, which
+        # costs the same however many tickers are configured; only tickers with
+        # other characters (e.g. BRK.B) need a regex alternation
         tickers = [t.upper() for t in self.get_config_value("tickers", [])]
-        self.ticker_pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in tickers) + r")\b")
+        self.ticker_words = frozenset(t for t in tickers if _WORD_PATTERN.fullmatch(t))
+        other_tickers = [t for t in tickers if t not in self.ticker_words]
+        self.ticker_pattern = re.compile(
+            r"\b(" + "|".join(re.escape(t) for t in other_tickers) + r")\b", re.IGNORECASE
+        ) if other_tickers else None
         
         # Ensure tickers exist in database
         self.ensure_stocks_exist(tickers)
+        
+        # Stock ids don't change during a scrape, so resolve them once
+        self._stock_ids = self.db.get_stock_ids()
+        # External ids already queued this run
+        self._seen_external_ids: Set[str] = set()
+    
+    def _create_reddit_client(self) -> praw.Reddit:
+        """Create a Reddit API client from the environment credentials."""
+        return praw.Reddit(
+            client_id=os.getenv("CLIENT_ID"),
+            client_secret=os.getenv("CLIENT_SECRET"),
+            user_agent=os.getenv("USER_AGENT"),
+        )
     
     def _validate_config(self) -> None:
         """Validate Reddit configuration."""
@@ -57,16 +74,26 @@ class RedditDataSource(DataSource):
         """Get the name of this data source."""
         return "reddit"
     
-    def age_in_days(self, utc_timestamp: float) -> float:
-        """Calculate age of content in days."""
-        created = datetime.fromtimestamp(utc_timestamp, tz=timezone.utc)
-        now = datetime.now(timezone.utc)
-        return (now - created).total_seconds() / 86400.0
+    def age_in_days(self, utc_timestamp: float, now_ts: Optional[float] = None) -> float:
+        """Calculate age of content in days.
+        
+        Args:
+            utc_timestamp: Creation time in seconds since the epoch
+            now_ts: Current time in seconds since the epoch; read from the
+                clock when not given
+        """
+        if now_ts is None:
+            now_ts = time.time()
+        return (now_ts - utc_timestamp) / 86400.0
     
     def extract_tickers_from_text(self, text: str) -> List[str]:
         """Extract ticker symbols from text content."""
-        matches = self.ticker_pattern.findall(text.upper())
-        return list(set(matches))  # Remove duplicates
+        # A ticker matches \b<ticker>\b exactly when it is one whole word
+        found = {word for word in map(str.upper, _WORD_PATTERN.findall(text))
+                 if word in self.ticker_words}
+        if self.ticker_pattern:
+            found.update(match.upper() for match in self.ticker_pattern.findall(text))
+        return list(found)
     
     def is_within_time_range(self, age_days: float) -> bool:
         """Check if content age is within configured time range."""
@@ -93,95 +120,137 @@ class RedditDataSource(DataSource):
             "author": author,
             "age_days": age_days,
             "tickers": tickers
-        })
+        }, separators=(",", ":"))
     
-    def process_content_for_tickers(self, content: str, url: str, 
-                                   external_id: str, metadata: str) -> int:
-        """Process content and store mentions for each ticker found."""
-        found_tickers = self.extract_tickers_from_text(content)
-        stored_count = 0
-        
+    def collect_mentions(self, content: str, url: str, external_id: str,
+                         metadata: str, found_tickers: List[str]) -> List[Tuple[int, str, str, str, str]]:
+        """Build mention rows for each ticker found in the content."""
         if not found_tickers:
-            return 0
+            return []
         
-        # Check if already exists (once per content, not per ticker)
-        if self.is_duplicate(external_id):
-            return 0
+        # Mentions already in the database are dropped by INSERT OR IGNORE on
+        # the unique external_id, so only repeats within this run are checked here
+        if external_id in self._seen_external_ids:
+            return []
+        self._seen_external_ids.add(external_id)
         
-        # Store mention for each ticker mentioned
+        mentions = []
         for ticker in found_tickers:
-            stock_id = self.get_stock_id(ticker)
-            if stock_id and self.store_mention(stock_id, content, url, external_id, metadata):
-                stored_count += 1
-                print(f"✓ Stored mention {external_id.split('_')[-1]} for {ticker}")
+            stock_id = self._stock_ids.get(ticker)
+            if stock_id:
+                mentions.append((stock_id, content, url, external_id, metadata))
+        return mentions
+    
+    def flush_mentions(self, pending: List[Tuple[int, str, str, str, str]],
+                       post_count: int) -> Tuple[int, int]:
+        """Store pending mentions from ``post_count`` posts.
+        
+        external_id is unique, so at most one row per post is stored and the
+        posts that stored nothing were already in the database.
         
-        return stored_count
+        Returns:
+            Tuple[int, int]: (mentions stored, posts skipped as duplicates)
+        """
+        stored = self.store_mentions(pending)
+        return stored, post_count - stored
     
-    def process_submissions(self, subreddit_name: str, subreddit: Any) -> Tuple[int, int]:
-        """Process all submissions from a subreddit."""
+    def _process_items(self, subreddit_name: str, content_type: str, items: Iterable[Any],
+                       get_content: Callable[[Any], str],
+                       get_url: Callable[[Any], str]) -> Tuple[int, int]:
+        """Store mentions from a newest-first stream of submissions or comments.
+        
+        Args:
+            subreddit_name: Subreddit the items come from
+            content_type: "submission" or "comment"
+            items: Items as listed by praw, newest first
+            get_content: Returns the text of an item
+            get_url: Returns the link stored with an item's mentions
+            
+        Returns:
+            Tuple[int, int]: (mentions stored, posts skipped)
+        """
         stored = 0
         skipped = 0
+        pending: List[Tuple[int, str, str, str, str]] = []
+        pending_posts = 0
         max_days = self.get_config_value("max_days", 7)
+        # One clock read per pass; the few seconds a pass takes don't matter
+        # against day-granularity age limits
+        now_ts = time.time()
         
-        for submission in subreddit.new(limit=None):
-            age = self.age_in_days(submission.created_utc)
-            
-            if age > max_days:
-                break
+        # Batches are written on their own thread while this one keeps
+        # fetching from the API; leaving the block waits for the last write
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="mention-writer") as writer:
+            writes: List[Future[Tuple[int, int]]] = []
+            for item in items:
+                age = self.age_in_days(item.created_utc, now_ts)
+                
+                if age > max_days:
+                    break
+                
+                if not self.is_within_time_range(age):
+                    continue
+                
+                content = get_content(item)
+                if not content:
+                    continue
+                
+                found_tickers = self.extract_tickers_from_text(content)
+                if not found_tickers:
+                    skipped += 1
+                    continue
+                
+                external_id = self.create_external_id(content_type, item.id)
+                metadata = self.create_metadata(content_type, subreddit_name,
+                                                str(item.author), age, found_tickers)
+                
+                mentions = self.collect_mentions(content, get_url(item), external_id,
+                                                 metadata, found_tickers)
+                if not mentions:
+                    skipped += 1
+                    continue
+                
+                pending.extend(mentions)
+                pending_posts += 1
+                if len(pending) >= MENTION_BATCH_SIZE:
+                    writes.append(writer.submit(self.flush_mentions, pending, pending_posts))
+                    pending = []
+                    pending_posts = 0
             
-            if not self.is_within_time_range(age):
-                continue
-            
-            content = self.get_submission_text(submission)
-            if not content:
-                continue
-            
-            external_id = self.create_external_id("submission", submission.id)
-            metadata = self.create_metadata("submission", subreddit_name, 
-                                          str(submission.author), age, 
-                                          self.extract_tickers_from_text(content))
-            
-            result = self.process_content_for_tickers(content, submission.url, 
-                                                    external_id, metadata)
-            if result > 0:
-                stored += result
-            else:
-                skipped += 1
-        
+            writes.append(writer.submit(self.flush_mentions, pending, pending_posts))
+        for write in writes:
+            batch_stored, batch_skipped = write.result()
+            stored += batch_stored
+            skipped += batch_skipped
         return stored, skipped
     
+    def process_submissions(self, subreddit_name: str, subreddit: Any) -> Tuple[int, int]:
+        """Process all submissions from a subreddit."""
+        return self._process_items(
+            subreddit_name, "submission", subreddit.new(limit=None),
+            self.get_submission_text, lambda submission: submission.url
+        )
+    
     def process_comments(self, subreddit_name: str, subreddit: Any) -> Tuple[int, int]:
         """Process all comments from a subreddit."""
-        stored = 0
-        skipped = 0
-        max_days = self.get_config_value("max_days", 7)
+        return self._process_items(
+            subreddit_name, "comment", subreddit.comments(limit=None),
+            lambda comment: comment.body or "",
+            lambda comment: f"https://reddit.com{comment.permalink}"
+        )
+    
+    def _scrape_one_subreddit(self, subreddit_name: str) -> Tuple[int, int]:
+        """Scrape submissions and comments from one subreddit."""
+        # praw clients are not thread-safe, so each worker uses its own
+        subreddit = self._create_reddit_client().subreddit(subreddit_name)
         
-        for comment in subreddit.comments(limit=None):
-            age = self.age_in_days(comment.created_utc)
-            
-            if age > max_days:
-                break
-            
-            if not self.is_within_time_range(age):
-                continue
-            
-            content = comment.body or ""
-            if not content:
-                continue
-            
-            external_id = self.create_external_id("comment", comment.id)
-            url = f"https://reddit.com{comment.permalink}"
-            metadata = self.create_metadata("comment", subreddit_name, 
-                                          str(comment.author), age, 
-                                          self.extract_tickers_from_text(content))
-            
-            result = self.process_content_for_tickers(content, url, 
-                                                    external_id, metadata)
-            if result > 0:
-                stored += result
-            else:
-                skipped += 1
+        sub_stored, sub_skipped = self.process_submissions(subreddit_name, subreddit)
+        comm_stored, comm_skipped = self.process_comments(subreddit_name, subreddit)
+        stored = sub_stored + comm_stored
+        skipped = sub_skipped + comm_skipped
         
+        # One line per subreddit; workers finish in any order
+        print(f"r/{subreddit_name}: stored={stored} skipped={skipped}")
         return stored, skipped
     
     def scrape(self) -> Dict[str, int]:
@@ -191,18 +260,15 @@ class RedditDataSource(DataSource):
         
         subreddits = self.get_config_value("subreddits", [])
         
-        for subreddit_name in subreddits:
-            print(f"Scanning r/{subreddit_name}...")
-            subreddit = self.reddit.subreddit(subreddit_name)
-            
-            # Process submissions and comments
-            sub_stored, sub_skipped = self.process_submissions(subreddit_name, subreddit)
-            comm_stored, comm_skipped = self.process_comments(subreddit_name, subreddit)
-            
-            total_stored += sub_stored + comm_stored
-            total_skipped += sub_skipped + comm_skipped
-            
-            time.sleep(2)  # Rate limiting
+        # Subreddits are scraped concurrently; the time goes to waiting on the
+        # API, and database writes are serialized by the shared Database.
+        # Request pacing is left to praw, which throttles each client from
+        # the rate-limit headers Reddit returns for the shared credentials
+        max_workers = max(1, min(self.get_config_value("max_workers", 8), len(subreddits)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for stored, skipped in executor.map(self._scrape_one_subreddit, subreddits):
+                total_stored += stored
+                total_skipped += skipped
         
         print(f"\nScraping complete! Stored: {total_stored}, Skipped: {total_skipped}")
-        return {"stored": total_stored, "skipped": total_skipped}
\ No newline at end of file
+        return {"stored": total_stored, "skipped": total_skipped}
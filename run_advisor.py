@@ -1,9 +1,6 @@
 #!/usr/bin/env python3
 """Run the Advisor CLI for analysis and recommendations."""
 
-import sys
-sys.path.append('.')
-
 from advisor.cli.advisor import main
 
 if __name__ == "__main__":
@@ -1,9 +1,6 @@
 #!/usr/bin/env python3
 """Run the Assistant CLI for data collection."""
 
-import sys
-sys.path.append('.')
-
 from advisor.cli.assistant import main
 
 if __name__ == "__main__":
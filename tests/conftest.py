@@ -1,39 +1,15 @@
 """Pytest configuration and shared fixtures."""
-import os
-import tempfile
+import copy
+import json
 import pytest
-from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock
 
+import advisor.core.config as config_module
 from advisor.core.database import Database
 from advisor.core.config import Config
 
 
-@pytest.fixture
-def temp_dir():
-    """Create a temporary directory for test files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
-
-
-@pytest.fixture
-def test_db_path(temp_dir):
-    """Provide a temporary database path."""
-    return temp_dir / "test.db"
-
-
-@pytest.fixture
-def test_database(test_db_path):
-    """Create a test database instance."""
-    db = Database(str(test_db_path))
-    yield db
-
-
-@pytest.fixture
-def test_config_file(temp_dir):
-    """Create a test configuration file."""
-    config_content = """
-{
+TEST_CONFIG = {
     "database": {
         "path": "test.db"
     },
@@ -51,12 +27,93 @@ def test_config_file(temp_dir):
         }
     }
 }
-"""
-    config_file = temp_dir / "test_config.json"
-    config_file.write_text(config_content)
+# Serialized once at import; the session fixture writes it as-is
+CONFIG_CONTENT = json.dumps(TEST_CONFIG, indent=4)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _stub_dotenv():
+    """Keep Config() from searching for and loading a .env file during tests."""
+    with pytest.MonkeyPatch.context() as patcher:
+        patcher.setattr(config_module, "load_dotenv", lambda *args, **kwargs: False)
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _reset_config_singleton():
+    """Start and finish every test without a global config instance."""
+    config_module._config_instance = None
+    yield
+    config_module._config_instance = None
+
+
+@pytest.fixture
+def temp_dir(tmp_path):
+    """Provide a temporary directory for test files."""
+    return tmp_path
+
+
+@pytest.fixture
+def test_db_path(temp_dir):
+    """Provide a temporary database path."""
+    return temp_dir / "test.db"
+
+
+@pytest.fixture
+def test_database():
+    """Create an in-memory test database instance.
+    
+    Each test gets its own private database without touching the
+    filesystem; tests of file-backed behaviour use test_db_path instead.
+    """
+    db = Database(":memory:")
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def mock_db_class(database_module, monkeypatch):
+    """Patch Database in the module under test with a specced mock class.
+    
+    Test modules name the module to patch by defining a database_module
+    fixture that returns its import path. Specced mocks reject calls to
+    methods the real classes don't have.
+    """
+    mock_db_class = Mock(spec=Database)
+    mock_db_class.get_shared.return_value = Mock(spec=Database)
+    monkeypatch.setattr(f"{database_module}.Database", mock_db_class)
+    return mock_db_class
+
+
+@pytest.fixture
+def mock_db(mock_db_class):
+    """Database mock handed out by every get_shared call in the test."""
+    return mock_db_class.get_shared.return_value
+
+
+@pytest.fixture(scope="session")
+def test_config_file(tmp_path_factory):
+    """Create a test configuration file, written once per session.
+    
+    Tests only read this file; one that needs to change it should write its own.
+    """
+    config_file = tmp_path_factory.mktemp("cfg") / "test_config.json"
+    config_file.write_text(CONFIG_CONTENT)
     return config_file
 
 
+@pytest.fixture(scope="session")
+def _default_config_template():
+    """Build the default configuration once per test session."""
+    return Config()
+
+
+@pytest.fixture
+def default_config(_default_config_template):
+    """Provide a private copy of the default configuration."""
+    return copy.deepcopy(_default_config_template)
+
+
 @pytest.fixture
 def test_config(test_config_file):
     """Create a test configuration instance."""
@@ -110,7 +167,7 @@ def sample_reddit_comments():
 
 
 @pytest.fixture
-def mock_env_vars():
+def mock_env_vars(monkeypatch):
     """Mock environment variables for testing."""
     env_vars = {
         "REDDIT_CLIENT_ID": "env_client_id",
@@ -118,5 +175,6 @@ def mock_env_vars():
         "REDDIT_USER_AGENT": "env_user_agent"
     }
     
-    with patch.dict(os.environ, env_vars):
-        yield env_vars
\ No newline at end of file
+    for name, value in env_vars.items():
+        monkeypatch.setenv(name, value)
+    return env_vars
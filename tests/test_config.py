@@ -1,30 +1,52 @@
 """Tests for advisor.core.config module."""
+import copy
 import json
-import os
 import pytest
 from pathlib import Path
-from unittest.mock import patch, mock_open
 
 from advisor.core.config import Config, get_config, init_config
 
 
+REDDIT_CREDENTIALS = {
+    "CLIENT_ID": "test_client_id",
+    "CLIENT_SECRET": "test_client_secret",
+    "USER_AGENT": "test_user_agent"
+}
+
+
+@pytest.fixture
+def reddit_env(request, monkeypatch):
+    """Set the Reddit credential variables to the parametrized values.
+    
+    Variables missing from the parameter are unset; .env loading is
+    already stubbed for the session, so local credentials can't leak in.
+    """
+    for name in REDDIT_CREDENTIALS:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in request.param.items():
+        monkeypatch.setenv(name, value)
+    return request.param
+
+
 class TestConfig:
     """Test suite for Config class."""
     
-    def test_default_config_initialization(self):
-        # Given: No config file provided
-        
-        # When: Creating a Config instance
-        config = Config()
-        
-        # Then: Should have default configuration values
-        assert config.get("database.path") == "advisor.db"
-        assert config.get("reddit.max_days") == 3
-        assert config.get("reddit.min_days") == 1
-        assert config.get("reddit.subreddits") == ["WallStreetBets"]
-        assert config.get("reddit.tickers") == ["AAPL", "TSLA", "GOOG"]
-        assert config.get("analysis.sentiment_threshold_buy") == 0.7
-        assert config.get("analysis.sentiment_threshold_sell") == 0.3
+    @pytest.mark.parametrize("key, expected", [
+        ("database.path", "advisor.db"),
+        ("reddit.max_days", 3),
+        ("reddit.min_days", 1),
+        ("reddit.subreddits", ["WallStreetBets"]),
+        ("reddit.tickers", ["AAPL", "TSLA", "GOOG"]),
+        ("analysis.sentiment_threshold_buy", 0.7),
+        ("analysis.sentiment_threshold_sell", 0.3),
+        ("analysis.max_mentions_per_stock", 10000)
+    ])
+    def test_default_values(self, default_config, key, expected):
+        # Given: Config created without a config file
+        
+        # When: Reading a value by dot notation key
+        # Then: Should return the default value
+        assert default_config.get(key) == expected
 
     def test_config_file_loading(self, test_config_file):
         # Given: A valid config file exists
@@ -52,19 +74,25 @@ class TestConfig:
         assert config.get("database.path") == "advisor.db"
         assert config.get("reddit.tickers") == ["AAPL", "TSLA", "GOOG"]
 
-    def test_dot_notation_get(self):
-        # Given: Config with nested values
-        config = Config()
-        
-        # When: Using dot notation to access values
-        # Then: Should return correct nested values
-        assert config.get("database.path") == "advisor.db"
+    def test_deepcopy_is_independent(self):
+        # Given: Config with a nested section from JSON
+        config = Config.from_json_str('{"analysis": {"sentiment": {"positive_threshold": 0.1}}}')
+        
+        # When: Deep-copying it and changing the copy
+        clone = copy.deepcopy(config)
+        clone._merge_config({"reddit": {"max_days": 30}})
+        clone.get("reddit.tickers").append("NVDA")
+        clone.get("analysis.sentiment")["positive_threshold"] = 0.9
+        
+        # Then: Should leave the original untouched and keep dot lookups working
+        assert clone.get("reddit.max_days") == 30
         assert config.get("reddit.max_days") == 3
-        assert config.get("analysis.sentiment_threshold_buy") == 0.7
+        assert config.get("reddit.tickers") == ["AAPL", "TSLA", "GOOG"]
+        assert config.get("analysis.sentiment") == {"positive_threshold": 0.1}
 
-    def test_dot_notation_get_nonexistent_key(self):
+    def test_dot_notation_get_nonexistent_key(self, default_config):
         # Given: Config instance
-        config = Config()
+        config = default_config
         
         # When: Accessing non-existent key with dot notation
         # Then: Should return default value
@@ -72,18 +100,42 @@ class TestConfig:
         assert config.get("nonexistent.key", "default") == "default"
         assert config.get("reddit.nonexistent", 42) == 42
 
-    def test_dot_notation_get_partial_path(self):
+    def test_dot_notation_get_partial_path(self, default_config):
         # Given: Config with nested structure
-        config = Config()
+        config = default_config
         
         # When: Accessing partial path that doesn't lead to value
         # Then: Should return default value
         assert config.get("reddit.nested.nonexistent") is None
         assert config.get("reddit.nested.nonexistent", "fallback") == "fallback"
 
-    def test_merge_config_nested_dict(self, temp_dir):
-        # Given: Config file with nested dictionary updates
-        # Create config file with partial reddit config
+    def test_get_section(self, default_config):
+        # Given: Config with nested sections
+        config = default_config
+        
+        # When: Getting a whole section by key
+        # Then: Should return the nested dict
+        assert config.get("analysis") == config._config["analysis"]
+        assert config.get("database") == {"path": "advisor.db"}
+
+    def test_config_file_reloaded_after_change(self, temp_dir):
+        # Given: Config file that has already been loaded once
+        config_file = temp_dir / "changing_config.json"
+        config_file.write_text(json.dumps({"extra": {"value": "first"}}))
+        first = Config(str(config_file))
+        first._merge_config({"extra": {"value": "mutated"}})
+        
+        # When: Loading it again unchanged, then after rewriting it
+        unchanged = Config(str(config_file))
+        config_file.write_text(json.dumps({"extra": {"value": "second-value"}}))
+        changed = Config(str(config_file))
+        
+        # Then: Should not leak mutations and should see the new content
+        assert unchanged.get("extra.value") == "first"
+        assert changed.get("extra.value") == "second-value"
+
+    def test_merge_config_nested_dict(self):
+        # Given: Config JSON with nested dictionary updates
         partial_config = {
             "reddit": {
                 "client_id": "new_client_id",
@@ -94,11 +146,8 @@ class TestConfig:
             }
         }
         
-        config_file = temp_dir / "partial_config.json"
-        config_file.write_text(json.dumps(partial_config))
-        
         # When: Merging configurations
-        config = Config(str(config_file))
+        config = Config.from_json_str(json.dumps(partial_config))
         
         # Then: Should merge nested dictionaries correctly
         assert config.get("reddit.client_id") == "new_client_id"
@@ -109,27 +158,24 @@ class TestConfig:
         # Should add new section
         assert config.get("new_section.field") == "value"
 
-    def test_merge_config_replace_non_dict(self, temp_dir):
-        # Given: Config file that replaces non-dict values
+    def test_merge_config_replace_non_dict(self):
+        # Given: Config JSON that replaces non-dict values
         replacement_config = {
             "reddit": {
                 "tickers": ["NVDA", "AMD"]  # Replace entire list
             }
         }
         
-        config_file = temp_dir / "replacement_config.json"
-        config_file.write_text(json.dumps(replacement_config))
-        
         # When: Merging configurations
-        config = Config(str(config_file))
+        config = Config.from_json_str(json.dumps(replacement_config))
         
         # Then: Should replace entire non-dict values
         assert config.get("reddit.tickers") == ["NVDA", "AMD"]
         assert config.get("reddit.max_days") == 3  # Other values preserved
 
-    def test_get_reddit_config(self):
+    def test_get_reddit_config(self, default_config):
         # Given: Config instance
-        config = Config()
+        config = default_config
         
         # When: Getting Reddit-specific configuration
         reddit_config = config.get_reddit_config()
@@ -141,9 +187,9 @@ class TestConfig:
         assert reddit_config["subreddits"] == ["WallStreetBets"]
         assert reddit_config["tickers"] == ["AAPL", "TSLA", "GOOG"]
 
-    def test_get_database_path(self):
+    def test_get_database_path(self, default_config):
         # Given: Config instance
-        config = Config()
+        config = default_config
         
         # When: Getting database path
         # Then: Should return configured database path
@@ -158,9 +204,9 @@ class TestConfig:
         # Then: Should return custom database path
         assert config.get_database_path() == "test.db"
 
-    def test_get_stock_symbols(self):
+    def test_get_stock_symbols(self, default_config):
         # Given: Config instance
-        config = Config()
+        config = default_config
         
         # When: Getting stock symbols to track
         symbols = config.get_stock_symbols()
@@ -169,114 +215,58 @@ class TestConfig:
         assert isinstance(symbols, list)
         assert symbols == ["AAPL", "TSLA", "GOOG"]
 
-    def test_get_stock_symbols_empty_when_missing(self, temp_dir):
+    def test_get_stock_symbols_empty_when_missing(self):
         # Given: Config with explicit empty tickers list
         empty_config = {
             "database": {"path": "test.db"},
             "reddit": {"tickers": []}  # Explicitly empty tickers
         }
-        config_file = temp_dir / "empty_config.json"
-        config_file.write_text(json.dumps(empty_config))
-        
         # When: Getting stock symbols
-        config = Config(str(config_file))
+        config = Config.from_json_str(json.dumps(empty_config))
         symbols = config.get_stock_symbols()
         
         # Then: Should return empty list
         assert symbols == []
 
-    @patch.dict(os.environ, {
-        "CLIENT_ID": "test_client_id",
-        "CLIENT_SECRET": "test_client_secret", 
-        "USER_AGENT": "test_user_agent"
-    })
-    def test_get_reddit_credentials_from_env(self):
-        # Given: Environment variables set for Reddit credentials
-        
-        # When: Getting Reddit credentials
-        config = Config()
-        creds = config.get_reddit_credentials()
-        
-        # Then: Should return credentials from environment
-        assert creds["client_id"] == "test_client_id"
-        assert creds["client_secret"] == "test_client_secret"
-        assert creds["user_agent"] == "test_user_agent"
-
-    @patch('advisor.core.config.load_dotenv')
-    @patch.dict(os.environ, {}, clear=True)
-    def test_get_reddit_credentials_missing_env(self, mock_load_dotenv):
-        # Given: No environment variables set
+    @pytest.mark.parametrize("reddit_env, expected", [
+        (REDDIT_CREDENTIALS, {
+            "client_id": "test_client_id",
+            "client_secret": "test_client_secret",
+            "user_agent": "test_user_agent"
+        }),
+        ({}, {"client_id": "", "client_secret": "", "user_agent": ""})
+    ], ids=["from_env", "missing_env"], indirect=["reddit_env"])
+    def test_get_reddit_credentials(self, reddit_env, expected):
+        # Given: Reddit credential environment variables set or unset
         
         # When: Getting Reddit credentials
         config = Config()
         creds = config.get_reddit_credentials()
         
-        # Then: Should return empty string values
-        assert creds["client_id"] == ""
-        assert creds["client_secret"] == ""
-        assert creds["user_agent"] == ""
-
-    @patch.dict(os.environ, {
-        "CLIENT_ID": "test_client_id",
-        "CLIENT_SECRET": "test_client_secret",
-        "USER_AGENT": "test_user_agent"
-    })
-    def test_validate_reddit_credentials_valid(self):
-        # Given: All required environment variables set
-        
-        # When: Validating Reddit credentials
-        config = Config()
-        
-        # Then: Should return True
-        assert config.validate_reddit_credentials() is True
-
-    @patch.dict(os.environ, {
-        "CLIENT_ID": "test_client_id",
-        "CLIENT_SECRET": "",  # Empty string
-        "USER_AGENT": "test_user_agent"
-    })
-    def test_validate_reddit_credentials_empty_value(self):
-        # Given: One environment variable is empty
-        
-        # When: Validating Reddit credentials
-        config = Config()
-        
-        # Then: Should return False
-        assert config.validate_reddit_credentials() is False
-
-    @patch('advisor.core.config.load_dotenv')
-    @patch.dict(os.environ, {
-        "CLIENT_ID": "test_client_id"
-        # Missing CLIENT_SECRET and USER_AGENT
-    }, clear=True)
-    def test_validate_reddit_credentials_missing_vars(self, mock_load_dotenv):
-        # Given: Some environment variables missing
-        
-        # When: Validating Reddit credentials
-        config = Config()
-        
-        # Then: Should return False
-        assert config.validate_reddit_credentials() is False
+        # Then: Should return the environment values, or empty strings
+        assert creds == expected
 
-    @patch('advisor.core.config.load_dotenv')
-    @patch.dict(os.environ, {}, clear=True)
-    def test_validate_reddit_credentials_no_env_vars(self, mock_load_dotenv):
-        # Given: No environment variables set
+    @pytest.mark.parametrize("reddit_env, expected", [
+        (REDDIT_CREDENTIALS, True),
+        ({**REDDIT_CREDENTIALS, "CLIENT_SECRET": ""}, False),
+        ({"CLIENT_ID": "test_client_id"}, False),
+        ({}, False)
+    ], ids=["valid", "empty_value", "missing_vars", "no_env_vars"], indirect=["reddit_env"])
+    def test_validate_reddit_credentials(self, reddit_env, expected):
+        # Given: A full, partial, or empty set of credentials
         
         # When: Validating Reddit credentials
         config = Config()
         
-        # Then: Should return False
-        assert config.validate_reddit_credentials() is False
+        # Then: Should only pass when every credential is non-empty
+        assert config.validate_reddit_credentials() is expected
 
 
 class TestGlobalConfigFunctions:
     """Test suite for global config functions."""
     
     def test_get_config_creates_instance(self):
-        # Given: No global config instance exists
-        import advisor.core.config
-        advisor.core.config._config_instance = None
+        # Given: No global config instance exists (reset by conftest)
         
         # When: Calling get_config()
         config = get_config()
@@ -286,7 +276,7 @@ class TestGlobalConfigFunctions:
         assert config.get("database.path") == "advisor.db"
 
     def test_get_config_returns_same_instance(self):
-        # Given: Global config instance exists
+        # Given: Global config instance created by a first call
         
         # When: Calling get_config() multiple times
         config1 = get_config()
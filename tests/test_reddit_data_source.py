@@ -0,0 +1,178 @@
+"""Tests for advisor.scrapers.reddit.data_source module."""
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from advisor.core.config import Config
+from advisor.scrapers.reddit import data_source as reddit_module
+from advisor.scrapers.reddit.data_source import RedditDataSource
+
+
+REDDIT_CONFIG = {
+    "subreddits": ["stocks"],
+    "tickers": ["AAPL", "tsla", "BRK.B"],
+    "max_days": 7
+}
+
+
+def make_submission(post_id, title, age_days=0.1, selftext=""):
+    """Build a submission with the attributes the scraper reads."""
+    return SimpleNamespace(
+        id=post_id,
+        title=title,
+        selftext=selftext,
+        created_utc=time.time() - age_days * 86400,
+        url=f"https://reddit.com/r/stocks/{post_id}",
+        author="poster"
+    )
+
+
+def make_comment(comment_id, body, age_days=0.1):
+    """Build a comment with the attributes the scraper reads."""
+    return SimpleNamespace(
+        id=comment_id,
+        body=body,
+        created_utc=time.time() - age_days * 86400,
+        permalink=f"/r/stocks/comments/{comment_id}",
+        author="commenter"
+    )
+
+
+def make_subreddit(submissions=(), comments=()):
+    """Build a subreddit listing the given items newest first."""
+    return SimpleNamespace(
+        new=lambda limit: iter(submissions),
+        comments=lambda limit: iter(comments)
+    )
+
+
+@pytest.fixture
+def reddit_source_factory(monkeypatch, test_database):
+    """Build RedditDataSource instances backed by the in-memory database.
+    
+    The returned callable takes the subreddit every praw client should
+    return; no request reaches Reddit.
+    """
+    monkeypatch.setenv("CLIENT_ID", "test_client_id")
+    monkeypatch.setenv("CLIENT_SECRET", "test_client_secret")
+    monkeypatch.setenv("USER_AGENT", "test_user_agent")
+    monkeypatch.setattr(reddit_module, "load_dotenv", lambda *args, **kwargs: False)
+    
+    mock_config = Mock(spec=Config)
+    mock_config.get_database_path.return_value = ":memory:"
+    monkeypatch.setattr("advisor.core.data_source.get_config", lambda: mock_config)
+    monkeypatch.setattr("advisor.core.data_source.Database.get_shared",
+                        lambda db_path: test_database)
+    
+    def build(subreddit=None):
+        client = SimpleNamespace(subreddit=lambda name: subreddit or make_subreddit())
+        monkeypatch.setattr(RedditDataSource, "_create_reddit_client", lambda self: client)
+        return RedditDataSource(REDDIT_CONFIG)
+    
+    return build
+
+
+def count_mentions(db):
+    """Count stored mention rows."""
+    return db.connection.execute("SELECT COUNT(*) FROM mentions").fetchone()[0]
+
+
+class TestRedditDataSource:
+    """Test suite for RedditDataSource class."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Loading up on aapl and Tsla", ["AAPL", "TSLA"]),
+        ("$AAPL calls, AAPL puts", ["AAPL"]),
+        ("BRK.B is my whole portfolio", ["BRK.B"]),
+        ("brk.b keeps compounding", ["BRK.B"]),
+        ("AAPL_TSLA spread and TSLAQ", []),
+        ("Nothing to see here", [])
+    ], ids=["mixed_case", "repeated", "dotted_ticker", "dotted_lowercase",
+            "underscore_joined", "no_tickers"])
+    def test_extract_tickers_from_text(self, reddit_source_factory, text, expected):
+        """
+        Given: Reddit source configured with word and dotted tickers
+        When: Extracting tickers from text
+        Then: Should find each whole-word ticker once, in any case
+        """
+        source = reddit_source_factory()
+        
+        assert sorted(source.extract_tickers_from_text(text)) == expected
+
+    def test_process_submissions_writes_in_batches(self, reddit_source_factory,
+                                                   test_database, monkeypatch):
+        """
+        Given: More ticker posts than fit in one batch
+        When: Processing submissions
+        Then: Should store every post, writing full batches then the rest
+        """
+        monkeypatch.setattr(reddit_module, "MENTION_BATCH_SIZE", 2)
+        source = reddit_source_factory()
+        batch_sizes = []
+        store_mentions = source.store_mentions
+        monkeypatch.setattr(source, "store_mentions",
+                            lambda mentions: batch_sizes.append(len(mentions)) or store_mentions(mentions))
+        subreddit = make_subreddit(
+            submissions=[make_submission(f"post{i}", f"AAPL update {i}") for i in range(5)]
+        )
+        
+        result = source.process_submissions("stocks", subreddit)
+        
+        assert result == (5, 0)
+        assert batch_sizes == [2, 2, 1]
+        assert count_mentions(test_database) == 5
+
+    def test_process_submissions_skips_repeats_within_run(self, reddit_source_factory,
+                                                          test_database):
+        """
+        Given: The same submission listed twice in one run
+        When: Processing submissions
+        Then: Should store it once and count the repeat as skipped
+        """
+        source = reddit_source_factory()
+        post = make_submission("post1", "AAPL earnings thread")
+        
+        result = source.process_submissions("stocks", make_subreddit(submissions=[post, post]))
+        
+        assert result == (1, 1)
+        assert count_mentions(test_database) == 1
+
+    def test_process_comments_stops_at_max_days(self, reddit_source_factory, test_database):
+        """
+        Given: Comments listed newest first, the last one older than max_days
+        When: Processing comments
+        Then: Should store the recent comment and stop at the old one
+        """
+        source = reddit_source_factory()
+        comments = [
+            make_comment("c1", "TSLA to the moon"),
+            make_comment("c2", "AAPL is old news", age_days=8)
+        ]
+        
+        result = source.process_comments("stocks", make_subreddit(comments=comments))
+        
+        assert result == (1, 0)
+        url = test_database.connection.execute("SELECT url FROM mentions").fetchone()[0]
+        assert url == "https://reddit.com/r/stocks/comments/c1"
+
+    def test_scrape_totals_count_posts(self, reddit_source_factory, test_database):
+        """
+        Given: A subreddit with a two-ticker post, a ticker comment and a post without tickers
+        When: Scraping it twice with fresh sources
+        Then: Should count each post once, as stored first and skipped after
+        """
+        subreddit = make_subreddit(
+            submissions=[
+                make_submission("post1", "AAPL vs TSLA"),
+                make_submission("post2", "Weekly discussion")
+            ],
+            comments=[make_comment("c1", "brk.b all day")]
+        )
+        
+        first = reddit_source_factory(subreddit).scrape()
+        second = reddit_source_factory(subreddit).scrape()
+        
+        assert first == {"stored": 2, "skipped": 1}
+        assert second == {"stored": 0, "skipped": 3}
+        assert count_mentions(test_database) == 2
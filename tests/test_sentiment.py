@@ -1,45 +1,89 @@
 """Tests for advisor.analysis.sentiment module."""
-import json
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from types import MappingProxyType
+from unittest.mock import Mock
 
 from advisor.analysis.sentiment import SentimentAnalyzer
+from advisor.core.config import Config
 from advisor.core.database import Database
 
 
+# A stored mention that has no score yet, shared by the tests below; read-only
+# so code that mutates a mention row fails loudly instead of leaking state
+UNSCORED_MENTION = MappingProxyType({
+    "id": 1,
+    "content": "Test content",
+    "url": "https://reddit.com/post1",
+    "external_id": "reddit_submission_post1",
+    "metadata": '{"type": "submission"}'
+})
+
+
+@pytest.fixture
+def mock_config(monkeypatch):
+    """Patch the config lookup made by SentimentAnalyzer.__init__.
+    
+    Every config.get returns its default; a test that needs other values
+    sets get.side_effect (e.g. a dict's bound get) before building its
+    analyzer.
+    """
+    mock_config = Mock(spec=Config)
+    mock_config.get_database_path.return_value = "test.db"
+    mock_config.get.side_effect = lambda key, default=None: default
+    monkeypatch.setattr("advisor.analysis.sentiment.get_config", lambda: mock_config)
+    return mock_config
+
+
+@pytest.fixture
+def database_module():
+    """SentimentAnalyzer.__init__ looks up Database in this module."""
+    return "advisor.analysis.sentiment"
+
+
+@pytest.fixture
+def analyzer(mock_config, mock_db):
+    """SentimentAnalyzer with default config and mocked dependencies.
+    
+    Each test gets its own instance, so tests stub its methods by plain
+    assignment without restoring them.
+    """
+    return SentimentAnalyzer()
+
+
+@pytest.fixture(scope="module")
+def shared_analyzer():
+    """One SentimentAnalyzer for tests that only call its pure text scoring.
+    
+    Tests that configure or inspect the database mock use analyzer instead.
+    """
+    mock_config = Mock(spec=Config)
+    mock_config.get_database_path.return_value = "test.db"
+    mock_config.get.side_effect = lambda key, default=None: default
+    with pytest.MonkeyPatch.context() as patcher:
+        patcher.setattr("advisor.analysis.sentiment.get_config", lambda: mock_config)
+        patcher.setattr("advisor.analysis.sentiment.Database", Mock(spec=Database))
+        yield SentimentAnalyzer()
+
+
 class TestSentimentAnalyzer:
     """Test suite for SentimentAnalyzer class."""
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_initialization_default(self, mock_db_class, mock_get_config):
+    def test_initialization_default(self, analyzer, mock_db_class):
         """
         Given: No API URL or key provided
         When: Creating SentimentAnalyzer instance
         Then: Should use default API URL and initialize database
         """
-        mock_config = Mock()
-        mock_config.get_database_path.return_value = "test.db"
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
         assert analyzer.api_url == "https://api.openai.com/v1/chat/completions"
         assert analyzer.api_key is None
-        mock_db_class.assert_called_once_with("test.db")
+        mock_db_class.get_shared.assert_called_once_with("test.db")
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_initialization_custom(self, mock_db_class, mock_get_config):
+    def test_initialization_custom(self, mock_config, mock_db):
         """
         Given: Custom API URL and key provided
         When: Creating SentimentAnalyzer instance
         Then: Should use provided values
         """
-        mock_config = Mock()
-        mock_config.get_database_path.return_value = "test.db"
-        mock_get_config.return_value = mock_config
-        
         analyzer = SentimentAnalyzer(
             api_url="https://custom-api.com/chat",
             api_key="custom_key"
@@ -48,417 +92,243 @@ class TestSentimentAnalyzer:
         assert analyzer.api_url == "https://custom-api.com/chat"
         assert analyzer.api_key == "custom_key"
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_text_calls_simple_analysis(self, mock_db_class, mock_get_config):
+    def test_analyze_text_calls_simple_analysis(self, analyzer):
         """
         Given: Text content and ticker
         When: Analyzing text sentiment
         Then: Should call simple sentiment analysis
         """
-        mock_config = Mock()
-        mock_config.get_database_path.return_value = "test.db"
-        mock_get_config.return_value = mock_config
+        mock_simple = analyzer._simple_sentiment_analysis = Mock(return_value=0.5)
+        result = analyzer.analyze_text("AAPL is looking great!", "AAPL")
         
-        analyzer = SentimentAnalyzer()
-        
-        with patch.object(analyzer, '_simple_sentiment_analysis', return_value=0.5) as mock_simple:
-            result = analyzer.analyze_text("AAPL is looking great!", "AAPL")
-            
-            mock_simple.assert_called_once_with("AAPL is looking great!", "AAPL")
-            assert result == 0.5
+        mock_simple.assert_called_once_with("AAPL is looking great!", "AAPL")
+        assert result == 0.5
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_simple_sentiment_analysis_ticker_not_mentioned(self, mock_db_class, mock_get_config):
-        """
-        Given: Content that doesn't mention the ticker
+    @pytest.mark.parametrize("content, ticker, check", [
+        ("The market is doing well", "AAPL", lambda score: score == 0.0),
+        ("AAPL is bullish and going to the moon!", "AAPL", lambda score: 0.0 < score <= 1.0),
+        ("TSLA is bearish and will crash", "TSLA", lambda score: -1.0 <= score < 0.0),
+        # Mixed sentiment only has to stay in range
+        ("GOOG has good growth but may fall", "GOOG", lambda score: -1.0 <= score <= 1.0),
+        ("MSFT quarterly report discussion", "MSFT", lambda score: score == 0.0),
+        ("aapl is BULLISH and GREAT!", "AAPL", lambda score: score > 0.0),
+        ("AAPL buyer wore a badge downtown", "AAPL", lambda score: score == 0.0)
+    ], ids=[
+        "ticker_not_mentioned", "positive_words", "negative_words", "mixed_sentiment",
+        "no_sentiment_words", "case_insensitive", "whole_words_only"
+    ])
+    def test_simple_sentiment_analysis(self, shared_analyzer, content, ticker, check):
+        """
+        Given: Content with or without the ticker and sentiment words
         When: Performing simple sentiment analysis
-        Then: Should return neutral sentiment (0.0)
+        Then: Should score it by whole, case-insensitive word matches, within [-1, 1]
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
-        result = analyzer._simple_sentiment_analysis("The market is doing well", "AAPL")
-        assert result == 0.0
+        assert check(shared_analyzer._simple_sentiment_analysis(content, ticker))
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_simple_sentiment_analysis_positive_words(self, mock_db_class, mock_get_config):
+    def test_simple_sentiment_analysis_direction_with_entity(self, shared_analyzer):
         """
-        Given: Content with positive sentiment words about ticker
+        Given: Direction words next to financial entities
         When: Performing simple sentiment analysis
-        Then: Should return positive sentiment score
+        Then: Should score the movement relative to the entity
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
-        result = analyzer._simple_sentiment_analysis("AAPL is bullish and going to the moon!", "AAPL")
-        assert result > 0.0
-        assert result <= 1.0
+        assert shared_analyzer._simple_sentiment_analysis("AAPL costs increased again", "AAPL") < 0.0
+        assert shared_analyzer._simple_sentiment_analysis("AAPL losses fell this quarter", "AAPL") > 0.0
+        assert shared_analyzer._simple_sentiment_analysis("AAPL revenue dropped", "AAPL") < 0.0
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_simple_sentiment_analysis_negative_words(self, mock_db_class, mock_get_config):
+    def test_simple_sentiment_analysis_direction_without_entity(self, shared_analyzer):
         """
-        Given: Content with negative sentiment words about ticker
+        Given: Direction words with no financial entity nearby
         When: Performing simple sentiment analysis
-        Then: Should return negative sentiment score
+        Then: Should treat up as positive and down as negative
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
-        result = analyzer._simple_sentiment_analysis("TSLA is bearish and will crash", "TSLA")
-        assert result < 0.0
-        assert result >= -1.0
+        assert shared_analyzer._simple_sentiment_analysis("TSLA shares will rise", "TSLA") > 0.0
+        assert shared_analyzer._simple_sentiment_analysis("TSLA shares will fall", "TSLA") < 0.0
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_simple_sentiment_analysis_mixed_sentiment(self, mock_db_class, mock_get_config):
-        """
-        Given: Content with both positive and negative words
-        When: Performing simple sentiment analysis
-        Then: Should return balanced sentiment score
+    def test_analyze_mentions_for_stock_no_mentions(self, analyzer, mock_db):
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
-        result = analyzer._simple_sentiment_analysis("GOOG has good growth but may fall", "GOOG")
-        # Should be closer to neutral due to mixed sentiment
-        assert -1.0 <= result <= 1.0
-
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_simple_sentiment_analysis_no_sentiment_words(self, mock_db_class, mock_get_config):
-        """
-        Given: Content mentioning ticker but no sentiment words
-        When: Performing simple sentiment analysis
-        Then: Should return neutral sentiment
-        """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
-        result = analyzer._simple_sentiment_analysis("MSFT quarterly report discussion", "MSFT")
-        assert result == 0.0
-
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_simple_sentiment_analysis_case_insensitive(self, mock_db_class, mock_get_config):
-        """
-        Given: Content with mixed case ticker and sentiment words
-        When: Performing simple sentiment analysis
-        Then: Should handle case insensitively
+        Given: Stock with no mentions in database
+        When: Analyzing mentions for stock
+        Then: Should return zero values
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
+        mock_db.get_sentiment_stats.return_value = (0.0, 0, 0)
+        mock_db.iter_unscored_mentions_for_stock.return_value = []
         
-        analyzer = SentimentAnalyzer()
+        result = analyzer.analyze_mentions_for_stock("NVDA")
         
-        result = analyzer._simple_sentiment_analysis("aapl is BULLISH and GREAT!", "AAPL")
-        assert result > 0.0
+        expected = {"average_sentiment": 0.0, "total_mentions": 0, "analyzed": 0}
+        assert result == expected
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_mentions_for_stock_no_mentions(self, mock_db_class, mock_get_config):
+    def test_analyze_mentions_for_stock_default_limit(self, mock_config, mock_db):
         """
-        Given: Stock with no mentions in database
-        When: Analyzing mentions for stock
-        Then: Should return zero values
+        Given: Configured cap on mentions per stock
+        When: Analyzing mentions without an explicit limit
+        Then: Should analyze at most the configured number of new mentions
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
+        mock_config.get.side_effect = {"analysis.max_mentions_per_stock": 50}.get
         
-        mock_db = Mock()
-        mock_db.get_mentions_for_stock.return_value = []
-        mock_db_class.return_value = mock_db
+        mock_db.get_sentiment_stats.return_value = (0.0, 0, 0)
+        mock_db.iter_unscored_mentions_for_stock.return_value = []
         
         analyzer = SentimentAnalyzer()
-        result = analyzer.analyze_mentions_for_stock("NVDA")
+        analyzer.analyze_mentions_for_stock("AAPL")
+        analyzer.analyze_mentions_for_stock("AAPL", limit=10)
         
-        expected = {"average_sentiment": 0.0, "total_mentions": 0, "analyzed": 0}
-        assert result == expected
+        assert mock_db.iter_unscored_mentions_for_stock.call_args_list[0].args == ("AAPL", 50)
+        assert mock_db.iter_unscored_mentions_for_stock.call_args_list[1].args == ("AAPL", 10)
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_mentions_for_stock_with_existing_scores(self, mock_db_class, mock_get_config):
+    def test_analyze_mentions_for_stock_with_existing_scores(self, analyzer, mock_db):
         """
         Given: Mentions with existing sentiment scores
         When: Analyzing mentions for stock
         Then: Should use existing scores without re-analysis
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        mock_db = Mock()
-        mock_mentions = [
-            {"content": "AAPL is great", "sentiment_score": 0.8},
-            {"content": "AAPL is okay", "sentiment_score": 0.2}
-        ]
-        mock_db.get_mentions_for_stock.return_value = mock_mentions
-        mock_db_class.return_value = mock_db
+        mock_db.get_sentiment_stats.return_value = (0.8 + 0.2, 2, 2)
+        mock_db.iter_unscored_mentions_for_stock.return_value = []
         
-        analyzer = SentimentAnalyzer()
+        mock_analyze = analyzer.analyze_text = Mock()
         result = analyzer.analyze_mentions_for_stock("AAPL")
         
+        mock_analyze.assert_not_called()
+        mock_db.update_sentiment_scores.assert_not_called()
+        
         assert result["average_sentiment"] == 0.5  # (0.8 + 0.2) / 2
         assert result["total_mentions"] == 2
         assert result["analyzed"] == 2
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_mentions_for_stock_new_analysis(self, mock_db_class, mock_get_config):
+    def test_analyze_mentions_for_stock_new_analysis(self, analyzer, mock_db):
         """
         Given: Mentions without sentiment scores
         When: Analyzing mentions for stock
         Then: Should analyze and update database
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
+        mock_mentions = [dict(UNSCORED_MENTION, content="TSLA is bullish and great!")]
+        # Totals before and after the new score is stored
+        mock_db.get_sentiment_stats.side_effect = [(0.0, 0, 1), (0.7, 1, 1)]
+        mock_db.iter_unscored_mentions_for_stock.return_value = mock_mentions
+        mock_db.update_sentiment_scores.return_value = 1
         
-        mock_db = Mock()
-        mock_mentions = [
-            {
-                "content": "TSLA is bullish and great!",
-                "sentiment_score": None,
-                "url": "https://reddit.com/post1",
-                "metadata": '{"type": "submission"}'
-            }
-        ]
-        mock_db.get_mentions_for_stock.return_value = mock_mentions
-        mock_db.update_sentiment_score.return_value = True
-        mock_db_class.return_value = mock_db
+        mock_analyze = analyzer.analyze_text = Mock(return_value=0.7)
+        result = analyzer.analyze_mentions_for_stock("TSLA")
         
-        analyzer = SentimentAnalyzer()
+        mock_analyze.assert_called_once_with("TSLA is bullish and great!", "TSLA")
+        mock_db.update_sentiment_scores.assert_called_once_with([(0.7, 1)])
         
-        with patch.object(analyzer, 'analyze_text', return_value=0.7) as mock_analyze:
-            result = analyzer.analyze_mentions_for_stock("TSLA")
-            
-            mock_analyze.assert_called_once_with("TSLA is bullish and great!", "TSLA")
-            mock_db.update_sentiment_score.assert_called_once_with("reddit_submission_post1", 0.7)
-            
-            assert result["average_sentiment"] == 0.7
-            assert result["total_mentions"] == 1
-            assert result["analyzed"] == 1
+        assert result["average_sentiment"] == 0.7
+        assert result["total_mentions"] == 1
+        assert result["analyzed"] == 1
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_mentions_external_id_generation(self, mock_db_class, mock_get_config):
+    def test_analyze_mentions_for_stock_mixed_scores(self, analyzer, mock_db):
         """
-        Given: Mention with different metadata and URL formats
-        When: Analyzing mentions
-        Then: Should generate correct external_id
+        Given: One scored mention and one mention without a score
+        When: Analyzing mentions for stock
+        Then: Should combine stored and new scores
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        mock_db = Mock()
-        mock_mentions = [
-            {
-                "content": "Test content",
-                "sentiment_score": None,
-                "url": "https://reddit.com/r/stocks/comments/abc123/title",
-                "metadata": '{"type": "comment"}'
-            }
+        mock_db.get_sentiment_stats.side_effect = [(0.8, 1, 2), (0.8 + 0.4, 2, 2)]
+        mock_db.iter_unscored_mentions_for_stock.return_value = [
+            dict(UNSCORED_MENTION, content="AMD is okay")
         ]
-        mock_db.get_mentions_for_stock.return_value = mock_mentions
-        mock_db.update_sentiment_score.return_value = True
-        mock_db_class.return_value = mock_db
+        mock_db.update_sentiment_scores.return_value = 1
         
-        analyzer = SentimentAnalyzer()
+        analyzer.analyze_text = Mock(return_value=0.4)
+        result = analyzer.analyze_mentions_for_stock("AMD")
         
-        with patch.object(analyzer, 'analyze_text', return_value=0.5):
-            analyzer.analyze_mentions_for_stock("TEST")
-            
-            mock_db.update_sentiment_score.assert_called_once_with("reddit_comment_title", 0.5)
+        assert result["average_sentiment"] == pytest.approx(0.6)
+        assert result["total_mentions"] == 2
+        assert result["analyzed"] == 2
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_mentions_update_fails(self, mock_db_class, mock_get_config):
+    def test_analyze_mentions_updates_by_row_id(self, analyzer, mock_db):
         """
-        Given: Database update fails for sentiment score
+        Given: Mentions with and without an external_id
         When: Analyzing mentions
-        Then: Should not include failed update in results
+        Then: Should update each one by its row id
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        mock_db = Mock()
         mock_mentions = [
-            {
-                "content": "Test content",
-                "sentiment_score": None,
-                "url": "https://reddit.com/post1",
-                "metadata": '{"type": "submission"}'
-            }
+            dict(UNSCORED_MENTION, id=7, external_id="reddit_comment_def456"),
+            dict(UNSCORED_MENTION, id=8, external_id=None)
         ]
-        mock_db.get_mentions_for_stock.return_value = mock_mentions
-        mock_db.update_sentiment_score.return_value = False  # Update fails
-        mock_db_class.return_value = mock_db
-        
-        analyzer = SentimentAnalyzer()
-        
-        with patch.object(analyzer, 'analyze_text', return_value=0.5):
-            result = analyzer.analyze_mentions_for_stock("TEST")
-            
-            assert result["average_sentiment"] == 0.0  # No analyzed mentions
-            assert result["total_mentions"] == 1
-            assert result["analyzed"] == 0
-
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')  
-    def test_get_recommendation_insufficient_mentions(self, mock_db_class, mock_get_config):
-        """
-        Given: Sentiment score but insufficient mention count
-        When: Getting recommendation
-        Then: Should return HOLD
-        """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
+        mock_db.get_sentiment_stats.side_effect = [(0.0, 0, 2), (1.0, 2, 2)]
+        mock_db.iter_unscored_mentions_for_stock.return_value = mock_mentions
+        mock_db.update_sentiment_scores.return_value = 2
         
-        analyzer = SentimentAnalyzer()
+        analyzer.analyze_text = Mock(return_value=0.5)
+        analyzer.analyze_mentions_for_stock("TEST")
         
-        recommendation = analyzer.get_recommendation(0.9, 3)  # High sentiment, low count
-        assert recommendation == "HOLD"
+        mock_db.update_sentiment_scores.assert_called_once_with([(0.5, 7), (0.5, 8)])
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_get_recommendation_buy_signal(self, mock_db_class, mock_get_config):
+    def test_analyze_mentions_update_fails(self, analyzer, mock_db):
         """
-        Given: High sentiment score and sufficient mentions
-        When: Getting recommendation
-        Then: Should return BUY
-        """
-        mock_config = Mock()
-        mock_config.get.side_effect = lambda key, default: {
-            "analysis.sentiment_threshold_buy": 0.7,
-            "analysis.sentiment_threshold_sell": 0.3
-        }.get(key, default)
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
-        recommendation = analyzer.get_recommendation(0.8, 10)  # High sentiment, enough mentions
-        assert recommendation == "BUY"
-
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_get_recommendation_sell_signal(self, mock_db_class, mock_get_config):
+        Given: Database update fails for sentiment score
+        When: Analyzing mentions
+        Then: Should report the totals re-read after the write, without the failed score
         """
-        Given: Low sentiment score and sufficient mentions
-        When: Getting recommendation
-        Then: Should return SELL
-        """
-        mock_config = Mock()
-        mock_config.get.side_effect = lambda key, default: {
-            "analysis.sentiment_threshold_buy": 0.7,
-            "analysis.sentiment_threshold_sell": 0.3
-        }.get(key, default)
-        mock_get_config.return_value = mock_config
+        mock_mentions = [UNSCORED_MENTION]
+        mock_db.get_sentiment_stats.return_value = (0.0, 0, 1)  # Unchanged after the write
+        mock_db.iter_unscored_mentions_for_stock.return_value = mock_mentions
+        mock_db.update_sentiment_scores.return_value = 0  # Update fails
         
-        analyzer = SentimentAnalyzer()
+        analyzer.analyze_text = Mock(return_value=0.5)
+        result = analyzer.analyze_mentions_for_stock("TEST")
         
-        recommendation = analyzer.get_recommendation(0.2, 10)  # Low sentiment, enough mentions
-        assert recommendation == "SELL"
+        assert result["average_sentiment"] == 0.0  # No analyzed mentions
+        assert result["total_mentions"] == 1
+        assert result["analyzed"] == 0
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_get_recommendation_hold_signal(self, mock_db_class, mock_get_config):
+    @pytest.mark.parametrize("score, count, buy_threshold, sell_threshold, expected", [
+        (0.9, 3, 0.7, 0.3, "HOLD"),
+        (0.8, 10, 0.7, 0.3, "BUY"),
+        (0.2, 10, 0.7, 0.3, "SELL"),
+        (0.5, 10, 0.7, 0.3, "HOLD"),
+        # 0.75 would be BUY with default (0.7) but HOLD with custom (0.8)
+        (0.75, 10, 0.8, 0.2, "HOLD")
+    ], ids=["insufficient_mentions", "buy_signal", "sell_signal", "hold_signal", "custom_thresholds"])
+    def test_get_recommendation(self, mock_config, mock_db, score, count,
+                                buy_threshold, sell_threshold, expected):
         """
-        Given: Moderate sentiment score and sufficient mentions
+        Given: Sentiment thresholds in config, a score and a mention count
         When: Getting recommendation
-        Then: Should return HOLD
-        """
-        mock_config = Mock()
-        mock_config.get.side_effect = lambda key, default: {
-            "analysis.sentiment_threshold_buy": 0.7,
-            "analysis.sentiment_threshold_sell": 0.3
-        }.get(key, default)
-        mock_get_config.return_value = mock_config
-        
-        analyzer = SentimentAnalyzer()
-        
-        recommendation = analyzer.get_recommendation(0.5, 10)  # Moderate sentiment
-        assert recommendation == "HOLD"
-
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_get_recommendation_custom_thresholds(self, mock_db_class, mock_get_config):
+        Then: Should return HOLD below the mention minimum, else compare against the thresholds
         """
-        Given: Custom sentiment thresholds in config
-        When: Getting recommendation
-        Then: Should use custom thresholds
-        """
-        mock_config = Mock()
-        mock_config.get.side_effect = lambda key, default: {
-            "analysis.sentiment_threshold_buy": 0.8,  # Higher threshold
-            "analysis.sentiment_threshold_sell": 0.2   # Lower threshold
-        }.get(key, default)
-        mock_get_config.return_value = mock_config
+        mock_config.get.side_effect = {
+            "analysis.sentiment_threshold_buy": buy_threshold,
+            "analysis.sentiment_threshold_sell": sell_threshold
+        }.get
         
         analyzer = SentimentAnalyzer()
         
-        # 0.75 would be BUY with default (0.7) but HOLD with custom (0.8)
-        recommendation = analyzer.get_recommendation(0.75, 10)
-        assert recommendation == "HOLD"
+        assert analyzer.get_recommendation(score, count) == expected
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_all_stocks_empty_database(self, mock_db_class, mock_get_config):
+    def test_analyze_all_stocks_empty_database(self, analyzer, mock_db):
         """
         Given: Database with no stocks
         When: Analyzing all stocks
         Then: Should return empty results
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        mock_db = Mock()
-        mock_db.get_all_stocks.return_value = []
-        mock_db_class.return_value = mock_db
+        mock_db.get_sentiment_summary.return_value = []
         
-        analyzer = SentimentAnalyzer()
         result = analyzer.analyze_all_stocks()
         
         assert result == {}
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_all_stocks_with_data(self, mock_db_class, mock_get_config):
+    def test_analyze_all_stocks_with_data(self, analyzer, mock_db):
         """
-        Given: Database with multiple stocks
+        Given: Database with multiple stocks that have unscored mentions
         When: Analyzing all stocks
         Then: Should return analysis for each stock
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        mock_db = Mock()
-        mock_db.get_all_stocks.return_value = ["AAPL", "TSLA"]
-        mock_db_class.return_value = mock_db
-        
-        analyzer = SentimentAnalyzer()
+        mock_db.get_sentiment_summary.return_value = [
+            ("AAPL", 0.0, 0, 10),
+            ("TSLA", 0.0, 0, 10)
+        ]
         
-        # Mock the analyze_mentions_for_stock method
-        def mock_analyze_mentions(symbol):
-            return {
-                "average_sentiment": 0.8 if symbol == "AAPL" else 0.2,
-                "total_mentions": 10,
-                "analyzed": 8
-            }
+        # Per-stock analysis results, served by lookup
+        analyses = {
+            "AAPL": {"average_sentiment": 0.8, "total_mentions": 10, "analyzed": 8},
+            "TSLA": {"average_sentiment": 0.2, "total_mentions": 10, "analyzed": 8}
+        }
         
-        with patch.object(analyzer, 'analyze_mentions_for_stock', side_effect=mock_analyze_mentions):
-            with patch.object(analyzer, 'get_recommendation', side_effect=lambda s, c: "BUY" if s > 0.5 else "SELL"):
-                result = analyzer.analyze_all_stocks()
+        analyzer.analyze_mentions_for_stock = Mock(side_effect=analyses.__getitem__)
+        analyzer.get_recommendation = Mock(side_effect=lambda s, c: "BUY" if s > 0.5 else "SELL")
+        result = analyzer.analyze_all_stocks()
         
         assert "AAPL" in result
         assert "TSLA" in result
@@ -467,33 +337,50 @@ class TestSentimentAnalyzer:
         assert result["AAPL"]["average_sentiment"] == 0.8
         assert result["TSLA"]["average_sentiment"] == 0.2
 
-    @patch('advisor.analysis.sentiment.get_config')
-    @patch('advisor.analysis.sentiment.Database')
-    def test_analyze_mentions_malformed_metadata(self, mock_db_class, mock_get_config):
+    def test_analyze_all_stocks_fully_scored(self, analyzer, mock_db):
         """
-        Given: Mention with malformed JSON metadata
-        When: Analyzing mentions
-        Then: Should raise JSONDecodeError
+        Given: Stocks whose mentions are all scored
+        When: Analyzing all stocks
+        Then: Should use the summary without per-stock analysis
         """
-        mock_config = Mock()
-        mock_get_config.return_value = mock_config
-        
-        mock_db = Mock()
-        mock_mentions = [
-            {
-                "content": "Test content",
-                "sentiment_score": None,
-                "url": "https://reddit.com/post1",
-                "metadata": "invalid json"  # Malformed JSON
-            }
+        mock_db.get_sentiment_summary.return_value = [
+            ("AAPL", 8.0, 10, 10),
+            ("GOOG", 0.0, 0, 0)
         ]
-        mock_db.get_mentions_for_stock.return_value = mock_mentions
-        mock_db.update_sentiment_score.return_value = True
-        mock_db_class.return_value = mock_db
         
+        mock_analyze = analyzer.analyze_mentions_for_stock = Mock()
+        result = analyzer.analyze_all_stocks()
+        
+        mock_analyze.assert_not_called()
+        assert result["AAPL"] == {
+            "average_sentiment": 0.8,
+            "total_mentions": 10,
+            "analyzed": 10,
+            "recommendation": "BUY"
+        }
+        assert result["GOOG"]["average_sentiment"] == 0.0
+        assert result["GOOG"]["recommendation"] == "HOLD"
+
+    def test_analyze_mentions_counts_stored_scores_only(self, mock_config, mock_db_class, test_database):
+        """
+        Given: A real database with two tracked mentions and one without external_id
+        When: Analyzing mentions for the stock twice
+        Then: Should score every mention on the first pass and find nothing left on the second
+        """
+        mock_db_class.get_shared.return_value = test_database
+        stock_id = test_database.add_stock("AAPL")
+        test_database.add_mentions([
+            (stock_id, "AAPL is bullish", None, "post_1", None),
+            (stock_id, "AAPL looks great", None, "post_2", None),
+            (stock_id, "AAPL is strong", None, None, None)
+        ])
         analyzer = SentimentAnalyzer()
+        analyzer.analyze_text = Mock(return_value=0.5)
+        
+        first = analyzer.analyze_mentions_for_stock("AAPL")
+        second = analyzer.analyze_mentions_for_stock("AAPL")
         
-        with patch.object(analyzer, 'analyze_text', return_value=0.5):
-            # Should raise JSONDecodeError due to malformed metadata
-            with pytest.raises(json.JSONDecodeError):
-                analyzer.analyze_mentions_for_stock("TEST")
\ No newline at end of file
+        assert first == {"average_sentiment": 0.5, "total_mentions": 3, "analyzed": 3}
+        assert second == first
+        assert analyzer.analyze_text.call_count == 3
+        assert test_database.get_sentiment_stats("AAPL") == (1.5, 3, 3)